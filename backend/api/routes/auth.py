@@ -6,7 +6,6 @@ Handles API key management and session tokens
 from fastapi import APIRouter, HTTPException, Header
 from pydantic import BaseModel, Field
 from typing import Optional
-from datetime import datetime, timedelta
 import sys
 import os
 
@@ -23,21 +22,8 @@ def ensure_session_exists(session_id: str) -> str:
     Ensure session exists, create if it doesn't.
     Returns the session ID.
     """
-    # Check if session exists
-    if session_id not in session_manager._sessions:
+    if session_manager.ensure_session(session_id, user_id="web_user"):
         print(f"[AUTH] Session {session_id} not found, creating new one with same ID")
-        # Manually create session with the provided ID
-        session_manager._sessions[session_id] = {
-            "session_id": session_id,
-            "user_id": "web_user",
-            "created_at": datetime.now().isoformat(),
-            "expires_at": (
-                datetime.now() + timedelta(hours=24)
-            ).isoformat(),
-            "user_data": {},
-            "api_keys": {},
-            "preferences": {},
-        }
     return session_id
 
 
@@ -4,7 +4,9 @@ Handles communication with Notion API for workspace operations.
 """
 
 import requests
-from typing import Optional, Dict, Any, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Any, List, Tuple
 import json
 from datetime import datetime
 
@@ -13,18 +15,40 @@ class NotionClient:
     """Client for interacting with Notion API."""
 
     BASE_URL = "https://api.notion.com/v1"
+    DEFAULT_TIMEOUT = (3.05, 30)
 
-    def __init__(self, access_token: str, notion_version: str = "2022-06-28"):
+    def __init__(
+        self,
+        access_token: str,
+        notion_version: str = "2022-06-28",
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+    ):
         """
         Initialize the Notion client.
 
         Args:
             access_token: Notion API access token
             notion_version: Notion API version to use
+            timeout: (connect, read) timeout in seconds for each request
         """
         self.access_token = access_token
         self.notion_version = notion_version
+        self.timeout = timeout
         self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=8,
+                max_retries=Retry(
+                    total=2,
+                    backoff_factor=0.2,
+                    status_forcelist=(502, 503, 504),
+                    # Hand the last response back so raise_for_status reports it
+                    raise_on_status=False,
+                ),
+            ),
+        )
         self.session.headers.update(
             {
                 "Authorization": f"Bearer {access_token}",
@@ -59,7 +83,7 @@ class NotionClient:
         if sort:
             payload["sort"] = sort
 
-        response = self.session.post(url, json=payload)
+        response = self.session.post(url, json=payload, timeout=self.timeout)
         response.raise_for_status()
 
         return response.json()
@@ -75,7 +99,7 @@ class NotionClient:
             Page data
         """
         url = f"{self.BASE_URL}/pages/{page_id}"
-        response = self.session.get(url)
+        response = self.session.get(url, timeout=self.timeout)
         response.raise_for_status()
 
         return response.json()
@@ -91,7 +115,7 @@ class NotionClient:
             Database data
         """
         url = f"{self.BASE_URL}/databases/{database_id}"
-        response = self.session.get(url)
+        response = self.session.get(url, timeout=self.timeout)
         response.raise_for_status()
 
         return response.json()
@@ -143,7 +167,7 @@ class NotionClient:
         if content_blocks:
             page_data["children"] = content_blocks
 
-        response = self.session.post(url, json=page_data)
+        response = self.session.post(url, json=page_data, timeout=self.timeout)
         response.raise_for_status()
 
         return response.json()
@@ -185,7 +209,7 @@ class NotionClient:
         if description:
             database_data["description"] = [{"text": {"content": description}}]
 
-        response = self.session.post(url, json=database_data)
+        response = self.session.post(url, json=database_data, timeout=self.timeout)
         response.raise_for_status()
 
         return response.json()
@@ -215,7 +239,7 @@ class NotionClient:
         if archived is not None:
             update_data["archived"] = archived
 
-        response = self.session.patch(url, json=update_data)
+        response = self.session.patch(url, json=update_data, timeout=self.timeout)
         response.raise_for_status()
 
         return response.json()
@@ -252,7 +276,7 @@ class NotionClient:
         if description:
             update_data["description"] = [{"text": {"content": description}}]
 
-        response = self.session.patch(url, json=update_data)
+        response = self.session.patch(url, json=update_data, timeout=self.timeout)
         response.raise_for_status()
 
         return response.json()
@@ -276,7 +300,7 @@ class NotionClient:
         if start_cursor:
             params["start_cursor"] = start_cursor
 
-        response = self.session.get(url, params=params)
+        response = self.session.get(url, params=params, timeout=self.timeout)
         response.raise_for_status()
 
         return response.json()
@@ -296,7 +320,9 @@ class NotionClient:
         """
         url = f"{self.BASE_URL}/blocks/{block_id}/children"
 
-        response = self.session.patch(url, json={"children": children})
+        response = self.session.patch(
+            url, json={"children": children}, timeout=self.timeout
+        )
         response.raise_for_status()
 
         return response.json()
@@ -333,7 +359,7 @@ class NotionClient:
         if start_cursor:
             payload["start_cursor"] = start_cursor
 
-        response = self.session.post(url, json=payload)
+        response = self.session.post(url, json=payload, timeout=self.timeout)
         response.raise_for_status()
 
         return response.json()
@@ -405,7 +431,7 @@ class NotionClient:
             User information
         """
         url = f"{self.BASE_URL}/users/me"
-        response = self.session.get(url)
+        response = self.session.get(url, timeout=self.timeout)
         response.raise_for_status()
 
         return response.json()
@@ -418,7 +444,7 @@ class NotionClient:
             List of users
         """
         url = f"{self.BASE_URL}/users"
-        response = self.session.get(url)
+        response = self.session.get(url, timeout=self.timeout)
         response.raise_for_status()
 
         return response.json()
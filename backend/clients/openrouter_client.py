@@ -8,6 +8,36 @@ from typing import Optional, Dict, Any, List
 import json
 
 
+# Static instructions appended to every template prompt; joined once at import.
+_TEMPLATE_PROMPT_FORMAT = "\n".join(
+    [
+        "",
+        "Please generate a JSON response with the following structure:",
+        "{",
+        '  "pages": [',
+        "    {",
+        '      "title": "Page Title",',
+        '      "content": [',
+        '        {"type": "heading_1", "heading_1": {"rich_text": [{"text": {"content": "Heading"}}]}}',
+        "      ]",
+        "    }",
+        "  ],",
+        '  "databases": [',
+        "    {",
+        '      "title": "Database Title",',
+        '      "properties": {',
+        '        "Name": {"title": {}},',
+        '        "Status": {"select": {"options": [{"name": "Active"}, {"name": "Inactive"}]}}',
+        "      }",
+        "    }",
+        "  ]",
+        "}",
+        "",
+        "Ensure the template is practical and well-structured for Notion.",
+    ]
+)
+
+
 class OpenRouterClient:
     """Client for interacting with OpenRouter API."""
 
@@ -104,33 +134,7 @@ class OpenRouterClient:
             props_str = ", ".join([f"{k} ({v})" for k, v in custom_properties.items()])
             prompt_parts.append(f"Custom properties: {props_str}")
 
-        prompt_parts.extend(
-            [
-                "",
-                "Please generate a JSON response with the following structure:",
-                "{",
-                '  "pages": [',
-                "    {",
-                '      "title": "Page Title",',
-                '      "content": [',
-                '        {"type": "heading_1", "heading_1": {"rich_text": [{"text": {"content": "Heading"}}]}}',
-                "      ]",
-                "    }",
-                "  ],",
-                '  "databases": [',
-                "    {",
-                '      "title": "Database Title",',
-                '      "properties": {',
-                '        "Name": {"title": {}},',
-                '        "Status": {"select": {"options": [{"name": "Active"}, {"name": "Inactive"}]}}',
-                "      }",
-                "    }",
-                "  ]",
-                "}",
-                "",
-                "Ensure the template is practical and well-structured for Notion.",
-            ]
-        )
+        prompt_parts.append(_TEMPLATE_PROMPT_FORMAT)
 
         return "\n".join(prompt_parts)
 
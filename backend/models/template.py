@@ -3,49 +3,84 @@ Template model for the Notion Template Maker application.
 Handles template definitions, configurations, and metadata.
 """
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from datetime import datetime, timezone
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
+from operator import attrgetter
+import heapq
+import os
 import uuid
 import json
 
 
+# Number of ids generated per os.urandom() read.
+_ID_BATCH_SIZE = 256
+_id_pool: List[str] = []
+# A forked child must not hand out ids its parent already pre-generated.
+os.register_at_fork(after_in_child=_id_pool.clear)
+
+
+def _new_id() -> str:
+    """Return a random UUID4 string, drawing from a batched urandom pool."""
+    while True:
+        try:
+            return _id_pool.pop()
+        except IndexError:
+            buf = os.urandom(16 * _ID_BATCH_SIZE)
+            _id_pool.extend(
+                str(uuid.UUID(bytes=buf[i : i + 16], version=4))
+                for i in range(0, len(buf), 16)
+            )
+
+
+# Supported Notion property types.
+PropertyType = Literal[
+    "title",
+    "rich_text",
+    "number",
+    "select",
+    "multi_select",
+    "date",
+    "people",
+    "files",
+    "checkbox",
+    "url",
+    "email",
+    "phone_number",
+    "formula",
+    "relation",
+    "rollup",
+    "created_time",
+    "created_by",
+    "last_edited_time",
+    "last_edited_by",
+]
+
+# Supported template categories.
+TemplateCategory = Literal[
+    "general",
+    "project_management",
+    "knowledge_base",
+    "personal",
+    "business",
+    "education",
+    "health",
+    "finance",
+    "marketing",
+    "development",
+    "design",
+    "writing",
+    "research",
+]
+
+
 class TemplateProperty(BaseModel):
     """Represents a property in a Notion database."""
 
     name: str
-    type: str  # 'title', 'rich_text', 'number', 'select', 'multi_select', 'date', 'people', 'files', 'checkbox', 'url', 'email', 'phone_number'
+    type: PropertyType
     config: Dict[str, Any] = Field(default_factory=dict)
 
-    @field_validator("type")
-    @classmethod
-    def validate_property_type(cls, v):
-        """Validate property type is supported."""
-        valid_types = {
-            "title",
-            "rich_text",
-            "number",
-            "select",
-            "multi_select",
-            "date",
-            "people",
-            "files",
-            "checkbox",
-            "url",
-            "email",
-            "phone_number",
-            "formula",
-            "relation",
-            "rollup",
-            "created_time",
-            "created_by",
-            "last_edited_time",
-            "last_edited_by",
-        }
-        if v not in valid_types:
-            raise ValueError(f"Invalid property type: {v}")
-        return v
-
     def to_notion_format(self) -> Dict[str, Any]:
         """Convert to Notion API format."""
         notion_config = {self.type: self.config}
@@ -55,7 +90,7 @@ class TemplateProperty(BaseModel):
 class TemplateDatabase(BaseModel):
     """Represents a Notion database in a template."""
 
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=_new_id)
     title: str
     description: Optional[str] = None
     properties: List[TemplateProperty] = Field(default_factory=list)
@@ -100,7 +135,7 @@ class TemplateDatabase(BaseModel):
 class TemplatePage(BaseModel):
     """Represents a Notion page in a template."""
 
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=_new_id)
     title: str
     content: List[Dict[str, Any]] = Field(default_factory=list)
     icon: Optional[str] = None
@@ -136,11 +171,11 @@ class TemplatePage(BaseModel):
 class Template(BaseModel):
     """Main template model containing pages and databases."""
 
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=_new_id)
     name: Optional[str] = None
     title: Optional[str] = None  # Alias for name for backward compatibility
     description: Optional[str] = None
-    category: str = "general"  # 'general', 'project_management', 'knowledge_base', 'personal', 'business'
+    category: TemplateCategory = "general"
     version: str = "1.0.0"
     author: Optional[str] = None
 
@@ -164,34 +199,23 @@ class Template(BaseModel):
     # Template configuration
     config: Dict[str, Any] = Field(default_factory=dict)
 
-    @field_validator("category")
-    @classmethod
-    def validate_category(cls, v):
-        """Validate template category."""
-        valid_categories = {
-            "general",
-            "project_management",
-            "knowledge_base",
-            "personal",
-            "business",
-            "education",
-            "health",
-            "finance",
-            "marketing",
-            "development",
-            "design",
-            "writing",
-            "research",
-        }
-        if v not in valid_categories:
-            raise ValueError(f"Invalid category: {v}")
-        return v
+    # Lower-cased search text, cached against the fields it is built from
+    _search_key: Optional[tuple] = PrivateAttr(default=None)
+    _search_text: str = PrivateAttr(default="")
 
-    @field_validator("updated_at", mode="before")
+    @model_validator(mode="before")
     @classmethod
-    def set_updated_at(cls, v):
-        """Automatically set updated_at on model changes."""
-        return datetime.now(timezone.utc)
+    def set_timestamps(cls, data):
+        """Stamp missing created_at/updated_at from a single clock read."""
+        if isinstance(data, dict) and (
+            data.get("created_at") is None or data.get("updated_at") is None
+        ):
+            now = datetime.now(timezone.utc)
+            data = dict(data)
+            for key in ("created_at", "updated_at"):
+                if data.get(key) is None:
+                    data[key] = now
+        return data
 
     @field_validator("name", mode="before")
     @classmethod
@@ -234,6 +258,16 @@ class Template(BaseModel):
         self.usage_count += 1
         self.updated_at = datetime.now(timezone.utc)
 
+    def get_search_text(self) -> str:
+        """Get lower-cased name, description and tags for searching."""
+        key = (self.name, self.description, tuple(self.tags))
+        if key != self._search_key:
+            self._search_text = (
+                f"{self.name} {self.description or ''} {' '.join(self.tags)}".lower()
+            )
+            self._search_key = key
+        return self._search_text
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert template to dictionary."""
         return self.model_dump()
@@ -313,20 +347,13 @@ class TemplateCollection(BaseModel):
         self, query: str, category: Optional[str] = None
     ) -> List[Template]:
         """Search templates by name, description, or tags."""
-        results = []
         query_lower = query.lower()
-
-        for template in self.templates:
-            if category and template.category != category:
-                continue
-
-            # Search in name, description, and tags
-            searchable_text = f"{template.name} {template.description or ''} {' '.join(template.tags)}".lower()
-
-            if query_lower in searchable_text:
-                results.append(template)
-
-        return results
+        return [
+            template
+            for template in self.templates
+            if (not category or template.category == category)
+            and query_lower in template.get_search_text()
+        ]
 
     def get_templates_by_category(self, category: str) -> List[Template]:
         """Get all templates in a specific category."""
@@ -334,4 +361,4 @@ class TemplateCollection(BaseModel):
 
     def get_popular_templates(self, limit: int = 10) -> List[Template]:
         """Get most popular templates by usage count."""
-        return sorted(self.templates, key=lambda t: t.usage_count, reverse=True)[:limit]
+        return heapq.nlargest(limit, self.templates, key=attrgetter("usage_count"))
@@ -3,9 +3,24 @@ Error handling service for the Notion Template Maker application.
 Provides comprehensive error handling, recovery, and user-friendly error messages.
 """
 
+import asyncio
+import functools
+import re
 import traceback
 import sys
-from typing import Dict, Any, Optional, Callable, List, Union
+import time
+from collections import defaultdict
+from typing import (
+    Dict,
+    Any,
+    Optional,
+    Callable,
+    Awaitable,
+    DefaultDict,
+    List,
+    Tuple,
+    Union,
+)
 from datetime import datetime
 from enum import Enum
 from contextlib import contextmanager
@@ -16,7 +31,7 @@ from backend.services.logging_service import get_logger
 logger = get_logger(__name__)
 
 
-class ErrorSeverity(Enum):
+class ErrorSeverity(str, Enum):
     """Error severity levels."""
 
     LOW = "low"
@@ -25,7 +40,7 @@ class ErrorSeverity(Enum):
     CRITICAL = "critical"
 
 
-class ErrorCategory(Enum):
+class ErrorCategory(str, Enum):
     """Error categories for better classification."""
 
     NETWORK = "network"
@@ -40,6 +55,60 @@ class ErrorCategory(Enum):
     UNKNOWN = "unknown"
 
 
+# User-facing messages shown for each error category
+_CATEGORY_USER_MESSAGES = {
+    ErrorCategory.NETWORK: "Network connection issue. Please check your internet connection.",
+    ErrorCategory.AUTHENTICATION: "Authentication failed. Please check your credentials.",
+    ErrorCategory.AUTHORIZATION: "Access denied. You may not have permission for this action.",
+    ErrorCategory.VALIDATION: "Invalid input. Please check your data and try again.",
+    ErrorCategory.API: "Service temporarily unavailable. Please try again later.",
+    ErrorCategory.DATABASE: "Data storage issue. Your data is safe, but please try again.",
+    ErrorCategory.FILESYSTEM: "File system error. Please check file permissions.",
+    ErrorCategory.CONFIGURATION: "Configuration issue. Please contact support.",
+    ErrorCategory.BUSINESS_LOGIC: "Operation cannot be completed. Please try a different approach.",
+    ErrorCategory.UNKNOWN: "An unexpected error occurred. Please try again.",
+}
+_DEFAULT_USER_MESSAGE = _CATEGORY_USER_MESSAGES[ErrorCategory.UNKNOWN]
+
+# Streamlit display function name and message prefix for each severity; the
+# function is looked up on st at call time
+_SEVERITY_DISPLAY = {
+    ErrorSeverity.CRITICAL: ("error", "🚨 Critical Error: "),
+    ErrorSeverity.HIGH: ("error", "❌ Error: "),
+    ErrorSeverity.MEDIUM: ("warning", "⚠️ Warning: "),
+    ErrorSeverity.LOW: ("info", "ℹ️ "),
+}
+
+# Keyword patterns used to classify generic exceptions, in priority order
+_ERROR_KEYWORD_PATTERNS = (
+    (
+        re.compile("connection|timeout|network|dns|ssl"),
+        ErrorCategory.NETWORK,
+        ErrorSeverity.MEDIUM,
+    ),
+    (
+        re.compile("unauthorized|authentication|credentials|login"),
+        ErrorCategory.AUTHENTICATION,
+        ErrorSeverity.HIGH,
+    ),
+    (
+        re.compile("api|http|request|response|status"),
+        ErrorCategory.API,
+        ErrorSeverity.MEDIUM,
+    ),
+    (
+        re.compile("validation|invalid|required|format"),
+        ErrorCategory.VALIDATION,
+        ErrorSeverity.LOW,
+    ),
+    (
+        re.compile("file|directory|permission|access"),
+        ErrorCategory.FILESYSTEM,
+        ErrorSeverity.MEDIUM,
+    ),
+)
+
+
 class AppError(Exception):
     """Base exception class for application errors."""
 
@@ -71,25 +140,13 @@ class AppError(Exception):
         self.recovery_suggestions = recovery_suggestions or []
         self.context = context or {}
         self.timestamp = datetime.now()
-        self.traceback = traceback.format_exc()
+        # Only format when raised from an except block; holding on to the
+        # exception info instead would keep its frames alive with this error
+        self.traceback = traceback.format_exc() if sys.exc_info()[0] else ""
 
     def _generate_user_message(self) -> str:
         """Generate user-friendly message based on error category."""
-        category_messages = {
-            ErrorCategory.NETWORK: "Network connection issue. Please check your internet connection.",
-            ErrorCategory.AUTHENTICATION: "Authentication failed. Please check your credentials.",
-            ErrorCategory.AUTHORIZATION: "Access denied. You may not have permission for this action.",
-            ErrorCategory.VALIDATION: "Invalid input. Please check your data and try again.",
-            ErrorCategory.API: "Service temporarily unavailable. Please try again later.",
-            ErrorCategory.DATABASE: "Data storage issue. Your data is safe, but please try again.",
-            ErrorCategory.FILESYSTEM: "File system error. Please check file permissions.",
-            ErrorCategory.CONFIGURATION: "Configuration issue. Please contact support.",
-            ErrorCategory.BUSINESS_LOGIC: "Operation cannot be completed. Please try a different approach.",
-            ErrorCategory.UNKNOWN: "An unexpected error occurred. Please try again.",
-        }
-        return category_messages.get(
-            self.category, category_messages[ErrorCategory.UNKNOWN]
-        )
+        return _CATEGORY_USER_MESSAGES.get(self.category, _DEFAULT_USER_MESSAGE)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert error to dictionary."""
@@ -109,9 +166,11 @@ class ErrorHandler:
     """Comprehensive error handling service."""
 
     def __init__(self):
-        self.error_handlers: Dict[ErrorCategory, List[Callable]] = {}
-        self.recovery_strategies: Dict[ErrorCategory, List[Callable]] = {}
-        self.error_counts: Dict[str, int] = {}
+        self.error_handlers: Dict[ErrorCategory, Tuple[Callable, ...]] = {}
+        self.recovery_strategies: Dict[ErrorCategory, Tuple[Callable, ...]] = {}
+        self.error_counts: DefaultDict[Tuple[ErrorCategory, str], int] = defaultdict(
+            int
+        )
         self.max_retries = 3
 
     def register_error_handler(self, category: ErrorCategory, handler: Callable):
@@ -122,9 +181,8 @@ class ErrorHandler:
             category: Error category
             handler: Handler function
         """
-        if category not in self.error_handlers:
-            self.error_handlers[category] = []
-        self.error_handlers[category].append(handler)
+        handlers = self.error_handlers.get(category, ())
+        self.error_handlers[category] = handlers + (handler,)
 
     def register_recovery_strategy(self, category: ErrorCategory, strategy: Callable):
         """
@@ -134,9 +192,8 @@ class ErrorHandler:
             category: Error category
             strategy: Recovery function
         """
-        if category not in self.recovery_strategies:
-            self.recovery_strategies[category] = []
-        self.recovery_strategies[category].append(strategy)
+        strategies = self.recovery_strategies.get(category, ())
+        self.recovery_strategies[category] = strategies + (strategy,)
 
     def handle_error(
         self,
@@ -167,15 +224,16 @@ class ErrorHandler:
         logger.log_error(app_error, app_error.context, app_error.user_message)
 
         # Track error counts
-        error_key = f"{app_error.category.value}:{type(error).__name__}"
-        self.error_counts[error_key] = self.error_counts.get(error_key, 0) + 1
+        self.error_counts[(app_error.category, type(error).__name__)] += 1
 
         # Run category-specific handlers
-        for handler in self.error_handlers.get(app_error.category, []):
-            try:
-                handler(app_error)
-            except Exception as handler_error:
-                logger.error(f"Error handler failed: {handler_error}")
+        handlers = self.error_handlers.get(app_error.category)
+        if handlers:
+            for handler in handlers:
+                try:
+                    handler(app_error)
+                except Exception as handler_error:
+                    logger.error(f"Error handler failed: {handler_error}")
 
         # Attempt recovery
         if app_error.severity != ErrorSeverity.CRITICAL:
@@ -188,74 +246,21 @@ class ErrorHandler:
         error_message = str(error)
         error_type = type(error).__name__
 
-        # Network errors
-        if any(
-            keyword in error_message.lower()
-            for keyword in ["connection", "timeout", "network", "dns", "ssl"]
-        ):
-            return AppError(
-                error_message,
-                ErrorCategory.NETWORK,
-                ErrorSeverity.MEDIUM,
-                context={"error_type": error_type},
-            )
-
-        # Authentication errors
-        elif any(
-            keyword in error_message.lower()
-            for keyword in ["unauthorized", "authentication", "credentials", "login"]
-        ):
-            return AppError(
-                error_message,
-                ErrorCategory.AUTHENTICATION,
-                ErrorSeverity.HIGH,
-                context={"error_type": error_type},
-            )
+        message_lower = error_message.lower()
 
-        # API errors
-        elif any(
-            keyword in error_message.lower()
-            for keyword in ["api", "http", "request", "response", "status"]
-        ):
-            return AppError(
-                error_message,
-                ErrorCategory.API,
-                ErrorSeverity.MEDIUM,
-                context={"error_type": error_type},
-            )
+        # First matching keyword group wins, in priority order
+        category, severity = ErrorCategory.UNKNOWN, ErrorSeverity.MEDIUM
+        for pattern, pattern_category, pattern_severity in _ERROR_KEYWORD_PATTERNS:
+            if pattern.search(message_lower):
+                category, severity = pattern_category, pattern_severity
+                break
 
-        # Validation errors
-        elif any(
-            keyword in error_message.lower()
-            for keyword in ["validation", "invalid", "required", "format"]
-        ):
-            return AppError(
-                error_message,
-                ErrorCategory.VALIDATION,
-                ErrorSeverity.LOW,
-                context={"error_type": error_type},
-            )
-
-        # File system errors
-        elif any(
-            keyword in error_message.lower()
-            for keyword in ["file", "directory", "permission", "access"]
-        ):
-            return AppError(
-                error_message,
-                ErrorCategory.FILESYSTEM,
-                ErrorSeverity.MEDIUM,
-                context={"error_type": error_type},
-            )
-
-        # Default to unknown
-        else:
-            return AppError(
-                error_message,
-                ErrorCategory.UNKNOWN,
-                ErrorSeverity.MEDIUM,
-                context={"error_type": error_type},
-            )
+        return AppError(
+            error_message,
+            category,
+            severity,
+            context={"error_type": error_type},
+        )
 
     def _attempt_recovery(self, error: AppError) -> bool:
         """
@@ -267,7 +272,11 @@ class ErrorHandler:
         Returns:
             True if recovery successful
         """
-        for strategy in self.recovery_strategies.get(error.category, []):
+        strategies = self.recovery_strategies.get(error.category)
+        if not strategies:
+            return False
+
+        for strategy in strategies:
             try:
                 if strategy(error):
                     logger.info(f"Recovery successful for {error.category.value} error")
@@ -326,10 +335,8 @@ class ErrorHandler:
             except Exception as e:
                 last_error = e
                 if attempt < retries:
-                    delay = backoff_factor * (2**attempt)
+                    delay = backoff_factor * (1 << attempt)
                     logger.warning(f"Operation failed, retrying in {delay}s: {e}")
-                    import time
-
                     time.sleep(delay)
                 else:
                     logger.error(f"Operation failed after {retries + 1} attempts: {e}")
@@ -337,17 +344,56 @@ class ErrorHandler:
         # All retries failed
         raise self.handle_error(last_error, {"retries": retries})
 
+    async def aretry_operation(
+        self,
+        operation: Callable[..., Awaitable[Any]],
+        max_retries: Optional[int] = None,
+        backoff_factor: float = 1.0,
+        **kwargs,
+    ) -> Any:
+        """
+        Retry an async operation with exponential backoff.
+
+        Same as retry_operation, but waits with asyncio.sleep so the event
+        loop is not blocked between attempts.
+
+        Args:
+            operation: Coroutine function to retry
+            max_retries: Maximum number of retries
+            backoff_factor: Backoff factor for delay
+            **kwargs: Additional arguments for operation
+
+        Returns:
+            Operation result
+
+        Raises:
+            AppError: If all retries fail
+        """
+        retries = max_retries or self.max_retries
+        last_error = None
+
+        for attempt in range(retries + 1):
+            try:
+                return await operation(**kwargs)
+            except Exception as e:
+                last_error = e
+                if attempt < retries:
+                    delay = backoff_factor * (1 << attempt)
+                    logger.warning(f"Operation failed, retrying in {delay}s: {e}")
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error(f"Operation failed after {retries + 1} attempts: {e}")
+
+        # All retries failed
+        raise self.handle_error(last_error, {"retries": retries})
+
     def _display_error_to_user(self, error: AppError):
         """Display error to user in Streamlit interface."""
         try:
-            if error.severity == ErrorSeverity.CRITICAL:
-                st.error(f"🚨 Critical Error: {error.user_message}")
-            elif error.severity == ErrorSeverity.HIGH:
-                st.error(f"❌ Error: {error.user_message}")
-            elif error.severity == ErrorSeverity.MEDIUM:
-                st.warning(f"⚠️ Warning: {error.user_message}")
-            else:
-                st.info(f"ℹ️ {error.user_message}")
+            display_name, prefix = _SEVERITY_DISPLAY.get(
+                error.severity, _SEVERITY_DISPLAY[ErrorSeverity.LOW]
+            )
+            getattr(st, display_name)(f"{prefix}{error.user_message}")
 
             # Show recovery suggestions
             if error.recovery_suggestions:
@@ -370,7 +416,10 @@ class ErrorHandler:
         """Get error statistics."""
         return {
             "total_errors": sum(self.error_counts.values()),
-            "error_counts": self.error_counts.copy(),
+            "error_counts": {
+                f"{category.value}:{error_type}": count
+                for (category, error_type), count in self.error_counts.items()
+            },
             "categories": list(self.error_handlers.keys()),
             "recovery_strategies": list(self.recovery_strategies.keys()),
         }
@@ -397,10 +446,14 @@ def handle_errors(operation: str = None):
         operation: Operation description
     """
 
+    boundary = error_handler.error_boundary
+
     def decorator(func):
+        op_name = operation or func.__name__
+
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            op_name = operation or func.__name__
-            with error_handler.error_boundary(op_name):
+            with boundary(op_name):
                 return func(*args, **kwargs)
 
         return wrapper
@@ -408,6 +461,29 @@ def handle_errors(operation: str = None):
     return decorator
 
 
+# Recovery suggestions attached by the convenience functions below
+_NETWORK_SUGGESTIONS = (
+    "Check your internet connection",
+    "Try again in a few moments",
+    "Contact support if the problem persists",
+)
+_AUTH_SUGGESTIONS = (
+    "Verify your API credentials",
+    "Check if your API key is still valid",
+    "Re-authenticate if necessary",
+)
+_VALIDATION_SUGGESTIONS = (
+    "Review the input requirements",
+    "Check data formats and constraints",
+    "Ensure all required fields are filled",
+)
+_API_SUGGESTIONS = (
+    "Try again in a few moments",
+    "Check API service status",
+    "Contact support if the problem persists",
+)
+
+
 # Convenience functions for common error types
 def network_error(message: str, **context) -> AppError:
     """Create a network error."""
@@ -415,11 +491,7 @@ def network_error(message: str, **context) -> AppError:
         message,
         ErrorCategory.NETWORK,
         ErrorSeverity.MEDIUM,
-        recovery_suggestions=[
-            "Check your internet connection",
-            "Try again in a few moments",
-            "Contact support if the problem persists",
-        ],
+        recovery_suggestions=list(_NETWORK_SUGGESTIONS),
         context=context,
     )
 
@@ -430,11 +502,7 @@ def auth_error(message: str, **context) -> AppError:
         message,
         ErrorCategory.AUTHENTICATION,
         ErrorSeverity.HIGH,
-        recovery_suggestions=[
-            "Verify your API credentials",
-            "Check if your API key is still valid",
-            "Re-authenticate if necessary",
-        ],
+        recovery_suggestions=list(_AUTH_SUGGESTIONS),
         context=context,
     )
 
@@ -445,11 +513,7 @@ def validation_error(message: str, **context) -> AppError:
         message,
         ErrorCategory.VALIDATION,
         ErrorSeverity.LOW,
-        recovery_suggestions=[
-            "Review the input requirements",
-            "Check data formats and constraints",
-            "Ensure all required fields are filled",
-        ],
+        recovery_suggestions=list(_VALIDATION_SUGGESTIONS),
         context=context,
     )
 
@@ -465,10 +529,6 @@ def api_error(message: str, status_code: Optional[int] = None, **context) -> App
         message,
         ErrorCategory.API,
         severity,
-        recovery_suggestions=[
-            "Try again in a few moments",
-            "Check API service status",
-            "Contact support if the problem persists",
-        ],
+        recovery_suggestions=list(_API_SUGGESTIONS),
         context={"status_code": status_code, **context},
     )
@@ -5,45 +5,66 @@ Provides comprehensive logging, error tracking, and monitoring capabilities.
 
 import logging
 import logging.handlers
+import atexit
+import copy
 import json
 import sys
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Optional, List, Set
 from datetime import datetime
 from pathlib import Path
 import traceback
+from contextvars import ContextVar
 import threading
 from queue import Queue
 import os
 
 
+# Logging context for the current thread or task, keyed by context field name
+_CONTEXT_VARS = {
+    "user_id": ContextVar("log_user_id", default=None),
+    "session_id": ContextVar("log_session_id", default=None),
+    "request_id": ContextVar("log_request_id", default=None),
+    "component": ContextVar("log_component", default=None),
+}
+
+
 class LogContext:
     """Context manager for adding context to log messages."""
 
     def __init__(self, logger: "AppLogger", **context):
         self.logger = logger
         self.context = context
-        self.old_context = {}
+        self._tokens = []
 
     def __enter__(self):
-        # Save old context
-        for key in self.context:
-            if hasattr(self.logger, f"_context_{key}"):
-                self.old_context[key] = getattr(self.logger, f"_context_{key}")
-
-        # Set new context
-        for key, value in self.context.items():
-            setattr(self.logger, f"_context_{key}", value)
+        self._tokens = [
+            (var, var.set(self.context[key]))
+            for key, var in _CONTEXT_VARS.items()
+            if key in self.context
+        ]
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        # Restore old context
-        for key, value in self.old_context.items():
-            setattr(self.logger, f"_context_{key}", value)
-        else:
-            # Clear context if no old value
-            for key in self.context:
-                if hasattr(self.logger, f"_context_{key}"):
-                    delattr(self.logger, f"_context_{key}")
+        # Restore the previous context
+        for var, token in reversed(self._tokens):
+            var.reset(token)
+        self._tokens = []
+
+
+class _LocalQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler for an in-process listener.
+
+    The stock QueueHandler formats records into plain strings so they can be
+    pickled; here the records never leave the process, so only the message
+    arguments are merged and exception info is left for the real handlers.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
 
 class AppLogger:
@@ -56,6 +77,12 @@ class AppLogger:
     ERROR = logging.ERROR
     CRITICAL = logging.CRITICAL
 
+    # Handlers and listener shared by every AppLogger, created on first use
+    _queue_handler: Optional[logging.Handler] = None
+    _listener: Optional[logging.handlers.QueueListener] = None
+    _attached_loggers: Set[logging.Logger] = set()
+    _setup_lock = threading.Lock()
+
     def __init__(
         self, name: str = "notion-template-maker", log_level: int = logging.INFO
     ):
@@ -74,36 +101,32 @@ class AppLogger:
         # Remove existing handlers to avoid duplicates
         self.logger.handlers.clear()
 
-        # Create logs directory
         self.logs_dir = Path("logs")
-        self.logs_dir.mkdir(exist_ok=True)
 
         # Setup handlers
         self._setup_handlers()
 
-        # Context attributes
-        self._context_user_id = None
-        self._context_session_id = None
-        self._context_request_id = None
-        self._context_component = None
-
-        # Error tracking
-        self.error_queue = Queue()
-        self.error_handler_thread = threading.Thread(
-            target=self._process_errors, daemon=True
-        )
-        self.error_handler_thread.start()
-
     def _setup_handlers(self):
-        """Setup logging handlers."""
-        # Console handler
+        """Attach the shared queue handler, creating it on first use."""
+        with AppLogger._setup_lock:
+            if AppLogger._queue_handler is None:
+                AppLogger._queue_handler = self._create_queue_handler()
+            self.logger.addHandler(AppLogger._queue_handler)
+            AppLogger._attached_loggers.add(self.logger)
+
+    def _create_queue_handler(self) -> logging.Handler:
+        """Create the output handlers and the listener that feeds them."""
+        # Create logs directory
+        self.logs_dir.mkdir(exist_ok=True)
+
+        # Console handler; shared by every logger, so its level comes from the
+        # environment and each logger's own level does the filtering otherwise
         console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(self.log_level)
+        console_handler.setLevel(os.getenv("LOG_LEVEL", "NOTSET").upper())
         console_formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
         )
         console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
 
         # File handler for all logs
         file_handler = logging.handlers.RotatingFileHandler(
@@ -114,7 +137,6 @@ class AppLogger:
             "%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s"
         )
         file_handler.setFormatter(file_formatter)
-        self.logger.addHandler(file_handler)
 
         # Error file handler
         error_handler = logging.handlers.RotatingFileHandler(
@@ -124,7 +146,6 @@ class AppLogger:
         )
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(file_formatter)
-        self.logger.addHandler(error_handler)
 
         # JSON handler for structured logging
         json_handler = logging.handlers.RotatingFileHandler(
@@ -133,23 +154,56 @@ class AppLogger:
         json_handler.setLevel(logging.INFO)
         json_formatter = JsonFormatter()
         json_handler.setFormatter(json_formatter)
-        self.logger.addHandler(json_handler)
+
+        # Hand records off to a background listener so callers never block
+        # on formatting or file I/O
+        log_queue = Queue(-1)
+        AppLogger._listener = logging.handlers.QueueListener(
+            log_queue,
+            console_handler,
+            file_handler,
+            error_handler,
+            json_handler,
+            respect_handler_level=True,
+        )
+        AppLogger._listener.start()
+        return _LocalQueueHandler(log_queue)
+
+    @classmethod
+    def close(cls):
+        """
+        Stop the shared background listener, flushing any queued records.
+
+        The queue handler is detached from every logger it was added to, and the
+        next AppLogger created sets up a fresh handler and listener.
+        """
+        with cls._setup_lock:
+            if cls._listener is None:
+                return
+
+            for attached_logger in cls._attached_loggers:
+                attached_logger.removeHandler(cls._queue_handler)
+            cls._attached_loggers.clear()
+
+            cls._listener.stop()
+            for handler in cls._listener.handlers:
+                handler.close()
+            cls._listener = None
+            cls._queue_handler = None
 
     def _get_context_dict(self) -> Dict[str, Any]:
         """Get current logging context."""
-        context = {}
-        if self._context_user_id:
-            context["user_id"] = self._context_user_id
-        if self._context_session_id:
-            context["session_id"] = self._context_session_id
-        if self._context_request_id:
-            context["request_id"] = self._context_request_id
-        if self._context_component:
-            context["component"] = self._context_component
-        return context
+        return {
+            key: value
+            for key, var in _CONTEXT_VARS.items()
+            if (value := var.get())
+        }
 
     def _log_with_context(self, level: int, message: str, *args, **kwargs):
         """Log message with context."""
+        if not self.logger.isEnabledFor(level):
+            return
+
         context = self._get_context_dict()
         if context:
             message = f"{message} | Context: {context}"
@@ -160,6 +214,10 @@ class AppLogger:
 
         self.logger.log(level, message, *args, **kwargs)
 
+    def isEnabledFor(self, level: int) -> bool:
+        """Check whether a message at the given level would be logged."""
+        return self.logger.isEnabledFor(level)
+
     def debug(self, message: str, *args, **kwargs):
         """Log debug message."""
         self._log_with_context(self.DEBUG, message, *args, **kwargs)
@@ -200,18 +258,20 @@ class AppLogger:
             context: Additional context information
             user_message: User-friendly message
         """
+        if not self.logger.isEnabledFor(self.ERROR):
+            return
+
+        # Prefer the error's own traceback, falling back to the exception being
+        # handled (e.g. when error is an AppError wrapping it)
+        exc = error if error.__traceback__ is not None else sys.exc_info()[1]
         error_info = {
             "error_type": type(error).__name__,
             "error_message": str(error),
-            "traceback": traceback.format_exc(),
-            "timestamp": datetime.now().isoformat(),
+            "traceback": "".join(traceback.format_exception(exc)) if exc else None,
             "context": context or {},
             "user_message": user_message,
         }
 
-        # Add to error queue for processing
-        self.error_queue.put(error_info)
-
         # Log immediately
         self.error(f"Error occurred: {error_info['error_message']}", extra=error_info)
 
@@ -242,7 +302,6 @@ class AppLogger:
             "status_code": status_code,
             "duration": duration,
             "error": error,
-            "timestamp": datetime.now().isoformat(),
         }
 
         level = self.INFO if status_code and 200 <= status_code < 300 else self.WARNING
@@ -266,9 +325,8 @@ class AppLogger:
         """
         action_data = {
             "action": action,
-            "user_id": user_id or self._context_user_id,
-            "session_id": session_id or self._context_session_id,
-            "timestamp": datetime.now().isoformat(),
+            "user_id": user_id or _CONTEXT_VARS["user_id"].get(),
+            "session_id": session_id or _CONTEXT_VARS["session_id"].get(),
             **kwargs,
         }
 
@@ -288,7 +346,6 @@ class AppLogger:
         perf_data = {
             "operation": operation,
             "duration": duration,
-            "timestamp": datetime.now().isoformat(),
             "metadata": metadata or {},
         }
 
@@ -309,22 +366,6 @@ class AppLogger:
         """
         return LogContext(self, **context)
 
-    def _process_errors(self):
-        """Process errors from the error queue."""
-        while True:
-            try:
-                error_info = self.error_queue.get(timeout=1)
-                self._handle_error(error_info)
-                self.error_queue.task_done()
-            except:
-                continue  # Continue processing even if error handling fails
-
-    def _handle_error(self, error_info: Dict[str, Any]):
-        """Handle error information."""
-        # Here you could send to error tracking service like Sentry
-        # For now, just ensure it's logged with full context
-        pass
-
     def get_log_files(self) -> List[Path]:
         """Get list of log files."""
         return list(self.logs_dir.glob("*.log")) + list(self.logs_dir.glob("*.json"))
@@ -338,9 +379,15 @@ class AppLogger:
         """
         cutoff = datetime.now().timestamp() - (days * 24 * 60 * 60)
 
-        for log_file in self.get_log_files():
-            if log_file.stat().st_mtime < cutoff:
-                log_file.unlink()
+        with os.scandir(self.logs_dir) as entries:
+            for entry in entries:
+                if (
+                    entry.is_file()
+                    and entry.name.endswith((".log", ".json"))
+                    and not entry.name.startswith(".")
+                    and entry.stat().st_mtime < cutoff
+                ):
+                    os.unlink(entry.path)
 
     def __str__(self) -> str:
         """String representation."""
@@ -351,12 +398,55 @@ class AppLogger:
         return f"AppLogger(name={self.name}, level={self.log_level}, handlers={len(self.logger.handlers)})"
 
 
+# Standard LogRecord attributes that are not copied into JSON output as extras
+_RESERVED_RECORD_ATTRS = frozenset(
+    {
+        "name",
+        "msg",
+        "args",
+        "levelname",
+        "levelno",
+        "pathname",
+        "filename",
+        "module",
+        "exc_info",
+        "exc_text",
+        "stack_info",
+        "lineno",
+        "funcName",
+        "created",
+        "msecs",
+        "relativeCreated",
+        "thread",
+        "threadName",
+        "processName",
+        "process",
+        "message",
+    }
+)
+
+
 class JsonFormatter(logging.Formatter):
     """JSON formatter for structured logging."""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ISO prefix for the most recently seen second, reused across records
+        self._cached_second: Optional[int] = None
+        self._cached_second_str = ""
+
+    def _format_timestamp(self, created: float) -> str:
+        """Format a record's creation time as a local ISO 8601 string."""
+        second = int(created)
+        if second != self._cached_second:
+            self._cached_second = second
+            self._cached_second_str = datetime.fromtimestamp(second).isoformat()
+        microsecond = int((created - second) * 1_000_000)
+        return f"{self._cached_second_str}.{microsecond:06d}"
+
     def format(self, record):
         log_entry = {
-            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
+            "timestamp": self._format_timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -370,38 +460,20 @@ class JsonFormatter(logging.Formatter):
             log_entry["exception"] = self.formatException(record.exc_info)
 
         # Add extra fields
-        if hasattr(record, "__dict__"):
-            for key, value in record.__dict__.items():
-                if key not in [
-                    "name",
-                    "msg",
-                    "args",
-                    "levelname",
-                    "levelno",
-                    "pathname",
-                    "filename",
-                    "module",
-                    "exc_info",
-                    "exc_text",
-                    "stack_info",
-                    "lineno",
-                    "funcName",
-                    "created",
-                    "msecs",
-                    "relativeCreated",
-                    "thread",
-                    "threadName",
-                    "processName",
-                    "process",
-                    "message",
-                ]:
-                    log_entry[key] = value
+        extras = {
+            key: value
+            for key, value in record.__dict__.items()
+            if key not in _RESERVED_RECORD_ATTRS
+        }
+        if extras:
+            log_entry.update(extras)
 
         return json.dumps(log_entry, default=str)
 
 
 # Global logger instance
 logger = AppLogger()
+atexit.register(AppLogger.close)
 
 
 def get_logger(name: str = None) -> AppLogger:
@@ -431,15 +503,18 @@ def log_function_call(func_name: str = None):
         name = func_name or func.__name__
 
         def wrapper(*args, **kwargs):
-            start_time = datetime.now()
+            start_time = time.perf_counter()
             try:
-                logger.debug(f"Calling function: {name}")
+                debug_enabled = logger.isEnabledFor(logging.DEBUG)
+                if debug_enabled:
+                    logger.debug(f"Calling function: {name}")
                 result = func(*args, **kwargs)
-                duration = (datetime.now() - start_time).total_seconds()
-                logger.debug(f"Function {name} completed in {duration:.2f}s")
+                if debug_enabled:
+                    duration = time.perf_counter() - start_time
+                    logger.debug(f"Function {name} completed in {duration:.2f}s")
                 return result
             except Exception as e:
-                duration = (datetime.now() - start_time).total_seconds()
+                duration = time.perf_counter() - start_time
                 logger.log_error(e, {"function": name, "duration": duration})
                 raise
 
@@ -451,12 +526,14 @@ def log_function_call(func_name: str = None):
 class LoggingService:
     """Service wrapper for AppLogger to provide a simple interface."""
 
+    __slots__ = ("logger",)
+
     def __init__(self):
-        self.logger = AppLogger()
+        self.logger = get_logger()
 
     def log_info(self, message: str, context: Optional[Dict[str, Any]] = None):
         """Log an info message."""
-        self.logger.info(message, context)
+        self.logger.info(message, extra={"context": context or {}})
 
     def log_error(
         self,
@@ -465,12 +542,18 @@ class LoggingService:
         context: Optional[Dict[str, Any]] = None,
     ):
         """Log an error message."""
-        self.logger.error(message, error, context)
+        extra = {"context": context or {}}
+        if error is not None:
+            extra["error_type"] = type(error).__name__
+            extra["error_message"] = str(error)
+            self.logger.error(message, exc_info=error, extra=extra)
+        else:
+            self.logger.error(message, extra=extra)
 
     def log_warning(self, message: str, context: Optional[Dict[str, Any]] = None):
         """Log a warning message."""
-        self.logger.warning(message, context)
+        self.logger.warning(message, extra={"context": context or {}})
 
     def log_debug(self, message: str, context: Optional[Dict[str, Any]] = None):
         """Log a debug message."""
-        self.logger.debug(message, context)
+        self.logger.debug(message, extra={"context": context or {}})
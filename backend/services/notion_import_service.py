@@ -12,6 +12,16 @@ from backend.clients.notion_client import NotionClient
 class NotionImportService:
     """Service for importing templates into Notion."""
 
+    # Notion property types for shorthand template property strings
+    SIMPLE_PROPERTY_TYPES = {
+        "title": "title",
+        "text": "rich_text",
+        "number": "number",
+        "select": "select",
+        "checkbox": "checkbox",
+        "date": "date",
+    }
+
     def __init__(self, notion_client: Optional[NotionClient] = None):
         """
         Initialize the Notion import service.
@@ -294,21 +304,12 @@ class NotionImportService:
                     notion_properties[prop_name] = {"rich_text": {}}
             else:
                 # Simple property type string
-                prop_type = prop_config
-                if prop_type == "title":
-                    notion_properties[prop_name] = {"title": {}}
-                elif prop_type == "text":
-                    notion_properties[prop_name] = {"rich_text": {}}
-                elif prop_type == "number":
-                    notion_properties[prop_name] = {"number": {}}
-                elif prop_type == "select":
-                    notion_properties[prop_name] = {"select": {}}
-                elif prop_type == "checkbox":
-                    notion_properties[prop_name] = {"checkbox": {}}
-                elif prop_type == "date":
-                    notion_properties[prop_name] = {"date": {}}
-                else:
-                    notion_properties[prop_name] = {"rich_text": {}}
+                notion_type = "rich_text"
+                if isinstance(prop_config, str):
+                    notion_type = self.SIMPLE_PROPERTY_TYPES.get(
+                        prop_config, notion_type
+                    )
+                notion_properties[prop_name] = {notion_type: {}}
 
         return notion_properties
 
@@ -334,36 +335,11 @@ class NotionImportService:
             if not block_type:
                 continue
 
-            # Convert based on block type
-            if block_type == "paragraph":
-                notion_blocks.append(self._convert_paragraph_block(block))
-            elif block_type == "heading_1":
-                notion_blocks.append(self._convert_heading_block(block, 1))
-            elif block_type == "heading_2":
-                notion_blocks.append(self._convert_heading_block(block, 2))
-            elif block_type == "heading_3":
-                notion_blocks.append(self._convert_heading_block(block, 3))
-            elif block_type == "bulleted_list_item":
-                notion_blocks.append(
-                    self._convert_list_block(block, "bulleted_list_item")
-                )
-            elif block_type == "numbered_list_item":
-                notion_blocks.append(
-                    self._convert_list_block(block, "numbered_list_item")
-                )
-            elif block_type == "to_do":
-                notion_blocks.append(self._convert_todo_block(block))
-            elif block_type == "code":
-                notion_blocks.append(self._convert_code_block(block))
-            elif block_type == "quote":
-                notion_blocks.append(self._convert_quote_block(block))
-            elif block_type == "divider":
-                notion_blocks.append({"divider": {}})
-            elif block_type == "image":
-                notion_blocks.append(self._convert_image_block(block))
-            else:
-                # Convert to paragraph for unknown types
-                notion_blocks.append(self._convert_paragraph_block(block))
+            # Convert based on block type; unknown types become paragraphs
+            converter = self._BLOCK_CONVERTERS["paragraph"]
+            if isinstance(block_type, str):
+                converter = self._BLOCK_CONVERTERS.get(block_type, converter)
+            notion_blocks.append(converter(self, block))
 
         return notion_blocks
 
@@ -427,6 +403,25 @@ class NotionImportService:
                 }
             }
 
+    # Block converters keyed by template block type, called as converter(self, block)
+    _BLOCK_CONVERTERS = {
+        "paragraph": _convert_paragraph_block,
+        "heading_1": lambda self, block: self._convert_heading_block(block, 1),
+        "heading_2": lambda self, block: self._convert_heading_block(block, 2),
+        "heading_3": lambda self, block: self._convert_heading_block(block, 3),
+        "bulleted_list_item": lambda self, block: self._convert_list_block(
+            block, "bulleted_list_item"
+        ),
+        "numbered_list_item": lambda self, block: self._convert_list_block(
+            block, "numbered_list_item"
+        ),
+        "to_do": _convert_todo_block,
+        "code": _convert_code_block,
+        "quote": _convert_quote_block,
+        "divider": lambda self, block: {"divider": {}},
+        "image": _convert_image_block,
+    }
+
     def _extract_rich_text(self, rich_text_array: List[Any]) -> List[Dict[str, Any]]:
         """
         Extract rich text from template format to Notion API format.
@@ -4,13 +4,13 @@ Handles user sessions, API keys, and secure storage.
 """
 
 import os
+import copy
 import json
-import base64
-from typing import Optional, Dict, Any
+import heapq
+from collections import defaultdict
+from typing import Optional, Dict, Any, DefaultDict, List, Set, Tuple
 from datetime import datetime, timedelta
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.fernet import Fernet, InvalidToken
 import secrets
 
 
@@ -20,7 +20,20 @@ class SessionManager:
     # Session constants
     SESSION_TIMEOUT_HOURS = 24
     MAX_SESSIONS_PER_USER = 5
-    ENCRYPTION_KEY_LENGTH = 32
+
+    # Fields that update_session must not overwrite
+    PROTECTED_FIELDS = {
+        "session_id",
+        "user_id",
+        "created_at",
+        "expires_at",
+        "_expires_at_dt",
+        "encrypted_data",
+        "_decrypted_data",
+    }
+
+    # Fields stored in the encrypted snapshot; values must be JSON-serializable
+    SENSITIVE_FIELDS = ("user_data", "api_keys", "preferences")
 
     def __init__(self, encryption_key: Optional[str] = None):
         """
@@ -32,6 +45,9 @@ class SessionManager:
         self.encryption_key = encryption_key or self._generate_encryption_key()
         self._fernet = Fernet(self.encryption_key)
         self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._user_index: DefaultDict[str, Set[str]] = defaultdict(set)
+        # (expires_at, session_id) entries; stale ones are skipped on cleanup
+        self._expiry_heap: List[Tuple[datetime, str]] = []
 
     def _generate_encryption_key(self) -> str:
         """
@@ -40,16 +56,8 @@ class SessionManager:
         Returns:
             Base64-encoded encryption key
         """
-        # Use PBKDF2 to derive a key from a random salt
-        salt = secrets.token_bytes(16)
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=self.ENCRYPTION_KEY_LENGTH,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(secrets.token_bytes(32)))
-        return key.decode()
+        # 32 random bytes straight from the OS CSPRNG; no key stretching needed
+        return Fernet.generate_key().decode()
 
     def create_session(
         self, user_id: str, user_data: Optional[Dict[str, Any]] = None
@@ -63,45 +71,103 @@ class SessionManager:
 
         Returns:
             Session ID
+
+        Raises:
+            TypeError: If user_data is not JSON-serializable
         """
+        # Reject unserializable user data before evicting anything
+        self._check_serializable(user_data)
+
         # Clean up expired sessions first
         self._cleanup_expired_sessions()
 
         # Check session limit
         user_sessions = [
-            s for s in self._sessions.values() if s.get("user_id") == user_id
+            self._sessions[sid]
+            for sid in self._user_index.get(user_id, ())
+            if sid in self._sessions
         ]
         if len(user_sessions) >= self.MAX_SESSIONS_PER_USER:
             # Remove oldest session
             oldest_session = min(
                 user_sessions, key=lambda s: s.get("created_at", datetime.min)
             )
-            self._sessions = {
-                k: v for k, v in self._sessions.items() if v != oldest_session
-            }
+            self._remove_session(oldest_session["session_id"])
 
         # Generate session ID
         session_id = secrets.token_urlsafe(32)
 
-        # Create session data
+        self._add_session(self._new_session_data(session_id, user_id, user_data))
+
+        return session_id
+
+    def ensure_session(self, session_id: str, user_id: str) -> bool:
+        """
+        Create a session with a caller-supplied ID if it does not exist yet.
+
+        Unlike create_session, this does not enforce the per-user session limit.
+
+        Args:
+            session_id: Session identifier to use
+            user_id: Unique user identifier
+
+        Returns:
+            True if a new session was created, False if it already existed
+        """
+        if session_id in self._sessions:
+            return False
+
+        self._add_session(self._new_session_data(session_id, user_id))
+        return True
+
+    def _new_session_data(
+        self,
+        session_id: str,
+        user_id: str,
+        user_data: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build the data for a new session.
+
+        Args:
+            session_id: Session identifier
+            user_id: Unique user identifier
+            user_data: Additional user data to store
+
+        Returns:
+            Session data
+        """
+        now = datetime.now()
+        expires_at = now + timedelta(hours=self.SESSION_TIMEOUT_HOURS)
         session_data = {
             "session_id": session_id,
             "user_id": user_id,
-            "created_at": datetime.now().isoformat(),
-            "expires_at": (
-                datetime.now() + timedelta(hours=self.SESSION_TIMEOUT_HOURS)
-            ).isoformat(),
+            "created_at": now.isoformat(),
+            "expires_at": expires_at.isoformat(),
+            "_expires_at_dt": expires_at,
             "user_data": user_data or {},
             "api_keys": {},
             "preferences": {},
         }
 
-        # Encrypt sensitive data
-        session_data["encrypted_data"] = self._encrypt_session_data(session_data)
-
-        self._sessions[session_id] = session_data
-
-        return session_id
+        return session_data
+
+    def _add_session(self, session: Dict[str, Any]):
+        """Store a session and index it by user and expiry time."""
+        session_id = session["session_id"]
+        self._sessions[session_id] = session
+        self._user_index[session.get("user_id")].add(session_id)
+        self._push_expiry(self._get_expires_at(session), session_id)
+
+    def _remove_session(self, session_id: str):
+        """Remove a session and drop it from the user index."""
+        session = self._sessions.pop(session_id)
+        user_id = session.get("user_id")
+        user_session_ids = self._user_index.get(user_id)
+        if user_session_ids is not None:
+            user_session_ids.discard(session_id)
+            if not user_session_ids:
+                del self._user_index[user_id]
 
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -118,21 +184,23 @@ class SessionManager:
             return None
 
         # Check if session is expired
-        expires_at = datetime.fromisoformat(session.get("expires_at", ""))
-        if datetime.now() > expires_at:
+        if datetime.now() > self._get_expires_at(session):
             self.delete_session(session_id)
             return None
 
-        # Decrypt and return session data
-        try:
-            decrypted_data = self._decrypt_session_data(
-                session.get("encrypted_data", "")
-            )
-            return decrypted_data
-        except Exception:
-            # If decryption fails, session is invalid
-            self.delete_session(session_id)
-            return None
+        # Decrypt and return session data, reusing the last decryption until
+        # the session changes
+        decrypted_data = session.get("_decrypted_data")
+        if decrypted_data is None:
+            encrypted_data = self._get_encrypted_data(session)
+            try:
+                decrypted_data = self._decrypt_session_data(encrypted_data)
+            except (InvalidToken, json.JSONDecodeError):
+                # If decryption fails, session is invalid
+                self.delete_session(session_id)
+                return None
+            session["_decrypted_data"] = decrypted_data
+        return copy.deepcopy(decrypted_data)
 
     def update_session(self, session_id: str, updates: Dict[str, Any]) -> bool:
         """
@@ -144,25 +212,31 @@ class SessionManager:
 
         Returns:
             True if update successful, False otherwise
+
+        Raises:
+            TypeError: If an update to a sensitive field is not JSON-serializable
         """
         session = self._sessions.get(session_id)
         if not session:
             return False
 
         # Check if session is expired
-        expires_at = datetime.fromisoformat(session.get("expires_at", ""))
-        if datetime.now() > expires_at:
+        if datetime.now() > self._get_expires_at(session):
             self.delete_session(session_id)
             return False
 
+        # Reject unserializable sensitive values before changing anything
+        self._check_serializable(
+            {key: updates[key] for key in self.SENSITIVE_FIELDS if key in updates}
+        )
+
         # Update session data
         for key, value in updates.items():
-            if key in ["session_id", "created_at", "expires_at"]:
+            if key in self.PROTECTED_FIELDS:
                 continue  # Don't allow updating system fields
             session[key] = value
 
-        # Re-encrypt sensitive data
-        session["encrypted_data"] = self._encrypt_session_data(session)
+        self._invalidate_snapshot(session)
 
         return True
 
@@ -177,7 +251,7 @@ class SessionManager:
             True if deletion successful, False otherwise
         """
         if session_id in self._sessions:
-            del self._sessions[session_id]
+            self._remove_session(session_id)
             return True
         return False
 
@@ -208,8 +282,7 @@ class SessionManager:
             "stored_at": datetime.now().isoformat(),
         }
 
-        # Update encrypted data
-        session["encrypted_data"] = self._encrypt_session_data(session)
+        self._invalidate_snapshot(session)
 
         return True
 
@@ -258,7 +331,7 @@ class SessionManager:
         api_keys = session.get("api_keys", {})
         if provider in api_keys:
             del api_keys[provider]
-            session["encrypted_data"] = self._encrypt_session_data(session)
+            self._invalidate_snapshot(session)
             return True
         return False
 
@@ -273,16 +346,21 @@ class SessionManager:
 
         Returns:
             True if storage successful, False otherwise
+
+        Raises:
+            TypeError: If the preference is not JSON-serializable
         """
         session = self._sessions.get(session_id)
         if not session:
             return False
 
+        self._check_serializable({key: value})
+
         if "preferences" not in session:
             session["preferences"] = {}
         
         session["preferences"][key] = value
-        session["encrypted_data"] = self._encrypt_session_data(session)
+        self._invalidate_snapshot(session)
 
         return True
 
@@ -322,7 +400,7 @@ class SessionManager:
         preferences = session.get("preferences", {})
         if key in preferences:
             del preferences[key]
-            session["encrypted_data"] = self._encrypt_session_data(session)
+            self._invalidate_snapshot(session)
             return True
         return False
 
@@ -345,7 +423,8 @@ class SessionManager:
 
         new_expires_at = datetime.now() + timedelta(hours=hours)
         session["expires_at"] = new_expires_at.isoformat()
-        session["encrypted_data"] = self._encrypt_session_data(session)
+        session["_expires_at_dt"] = new_expires_at
+        self._push_expiry(new_expires_at, session_id)
 
         return True
 
@@ -359,18 +438,18 @@ class SessionManager:
         Returns:
             List of session data dictionaries
         """
+        now = datetime.now()
         user_sessions = []
-        for session in self._sessions.values():
-            if session.get("user_id") == user_id:
-                expires_at = datetime.fromisoformat(session.get("expires_at", ""))
-                if datetime.now() <= expires_at:
-                    user_sessions.append(
-                        {
-                            "session_id": session.get("session_id"),
-                            "created_at": session.get("created_at"),
-                            "expires_at": session.get("expires_at"),
-                        }
-                    )
+        for session_id in self._user_index.get(user_id, ()):
+            session = self._sessions.get(session_id)
+            if session and now <= self._get_expires_at(session):
+                user_sessions.append(
+                    {
+                        "session_id": session.get("session_id"),
+                        "created_at": session.get("created_at"),
+                        "expires_at": session.get("expires_at"),
+                    }
+                )
 
         return user_sessions
 
@@ -382,46 +461,118 @@ class SessionManager:
             session_data: Session data to encrypt
 
         Returns:
-            Encrypted data as base64 string
+            Fernet token for the encrypted data
         """
         # Extract sensitive data
         sensitive_data = {
-            "user_data": session_data.get("user_data", {}),
-            "api_keys": session_data.get("api_keys", {}),
-            "preferences": session_data.get("preferences", {}),
+            field: session_data.get(field, {}) for field in self.SENSITIVE_FIELDS
         }
 
         # Encrypt
         json_data = json.dumps(sensitive_data)
-        encrypted = self._fernet.encrypt(json_data.encode())
-        return base64.urlsafe_b64encode(encrypted).decode()
+        return self._fernet.encrypt(json_data.encode()).decode()
+
+    def _get_encrypted_data(self, session: Dict[str, Any]) -> str:
+        """
+        Get a session's encrypted snapshot, encrypting it first if missing.
+
+        Args:
+            session: Session data
+
+        Returns:
+            Fernet token for the session's sensitive data
+        """
+        encrypted_data = session.get("encrypted_data")
+        if encrypted_data is None:
+            encrypted_data = self._encrypt_session_data(session)
+            session["encrypted_data"] = encrypted_data
+        return encrypted_data
+
+    @staticmethod
+    def _check_serializable(value: Any):
+        """
+        Check that a value can go into the encrypted snapshot.
+
+        Snapshots are only built on read, so this surfaces bad values to the
+        writer instead of invalidating the session later.
+
+        Args:
+            value: Value about to be stored in a sensitive field
+
+        Raises:
+            TypeError: If the value is not JSON-serializable
+            ValueError: If the value contains a circular reference
+        """
+        json.dumps(value)
+
+    @staticmethod
+    def _invalidate_snapshot(session: Dict[str, Any]):
+        """Drop a session's encrypted and decrypted snapshots after a change."""
+        session.pop("encrypted_data", None)
+        session.pop("_decrypted_data", None)
 
     def _decrypt_session_data(self, encrypted_data: str) -> Dict[str, Any]:
         """
         Decrypt session data.
 
         Args:
-            encrypted_data: Encrypted data as base64 string
+            encrypted_data: Fernet token for the encrypted data
 
         Returns:
             Decrypted session data
         """
-        encrypted = base64.urlsafe_b64decode(encrypted_data.encode())
-        decrypted = self._fernet.decrypt(encrypted)
+        decrypted = self._fernet.decrypt(encrypted_data.encode())
         return json.loads(decrypted.decode())
 
+    @staticmethod
+    def _get_expires_at(session: Dict[str, Any]) -> datetime:
+        """
+        Get a session's expiry time, parsing and caching it on first use.
+
+        Sessions created outside create_session only carry the ISO string.
+
+        Args:
+            session: Session data
+
+        Returns:
+            Expiry time
+        """
+        expires_at = session.get("_expires_at_dt")
+        if expires_at is None:
+            expires_at = datetime.fromisoformat(session.get("expires_at", ""))
+            session["_expires_at_dt"] = expires_at
+        return expires_at
+
+    def _push_expiry(self, expires_at: datetime, session_id: str):
+        """
+        Add an expiry heap entry, compacting the heap when it is mostly stale.
+
+        Extending or deleting a session leaves its old entry behind; the heap is
+        rebuilt from the live sessions once those entries outnumber them.
+
+        Args:
+            expires_at: Session expiry time
+            session_id: Session identifier
+        """
+        heapq.heappush(self._expiry_heap, (expires_at, session_id))
+        if len(self._expiry_heap) > 2 * len(self._sessions):
+            self._expiry_heap = [
+                (self._get_expires_at(session), sid)
+                for sid, session in self._sessions.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+
     def _cleanup_expired_sessions(self):
         """Remove expired sessions from memory."""
         current_time = datetime.now()
-        expired_sessions = []
-
-        for session_id, session in self._sessions.items():
-            expires_at = datetime.fromisoformat(session.get("expires_at", ""))
-            if current_time > expires_at:
-                expired_sessions.append(session_id)
+        heap = self._expiry_heap
 
-        for session_id in expired_sessions:
-            del self._sessions[session_id]
+        while heap and heap[0][0] < current_time:
+            _, session_id = heapq.heappop(heap)
+            # Skip entries for sessions that were removed or extended since
+            session = self._sessions.get(session_id)
+            if session and current_time > self._get_expires_at(session):
+                self._remove_session(session_id)
 
     def get_session_stats(self) -> Dict[str, Any]:
         """
@@ -434,9 +585,9 @@ class SessionManager:
         active_sessions = 0
         expired_sessions = 0
 
+        now = datetime.now()
         for session in self._sessions.values():
-            expires_at = datetime.fromisoformat(session.get("expires_at", ""))
-            if datetime.now() <= expires_at:
+            if now <= self._get_expires_at(session):
                 active_sessions += 1
             else:
                 expired_sessions += 1
@@ -464,17 +615,12 @@ class SessionManager:
             for session_id, session in self._sessions.items():
                 if "encrypted_data" in session:
                     # Decrypt with old key
-                    old_encrypted = base64.urlsafe_b64decode(
+                    decrypted = self._fernet.decrypt(
                         session["encrypted_data"].encode()
                     )
-                    decrypted = self._fernet.decrypt(old_encrypted)
-                    json_data = decrypted.decode()
 
                     # Re-encrypt with new key
-                    new_encrypted = new_fernet.encrypt(json_data.encode())
-                    session["encrypted_data"] = base64.urlsafe_b64encode(
-                        new_encrypted
-                    ).decode()
+                    session["encrypted_data"] = new_fernet.encrypt(decrypted).decode()
 
             # Update to new key
             self.encryption_key = new_key
@@ -7,12 +7,64 @@ from typing import Optional, Dict, Any, List
 import json
 import time
 import hashlib
-from datetime import datetime
+from datetime import datetime, timezone
 from concurrent.futures import ThreadPoolExecutor, TimeoutError
 from backend.clients.openrouter_client import OpenRouterClient
 from backend.clients.notion_client import NotionClient
 
 
+# Block types kept from AI responses.
+_VALID_BLOCK_TYPES = frozenset(
+    {
+        "paragraph",
+        "heading_1",
+        "heading_2",
+        "heading_3",
+        "bulleted_list_item",
+        "numbered_list_item",
+        "to_do",
+        "code",
+        "quote",
+        "callout",
+        "divider",
+    }
+)
+
+# Block types whose content must carry a rich_text array.
+_RICH_TEXT_BLOCK_TYPES = frozenset(
+    {
+        "paragraph",
+        "heading_1",
+        "heading_2",
+        "heading_3",
+        "bulleted_list_item",
+        "numbered_list_item",
+        "to_do",
+    }
+)
+
+# Property types kept from AI responses.
+_VALID_PROPERTY_TYPES = frozenset(
+    {
+        "title",
+        "rich_text",
+        "number",
+        "select",
+        "multi_select",
+        "date",
+        "people",
+        "files",
+        "checkbox",
+        "url",
+        "email",
+        "phone_number",
+        "formula",
+        "relation",
+        "rollup",
+    }
+)
+
+
 class TemplateGenerator:
     """Service for generating Notion templates using AI."""
 
@@ -90,7 +142,7 @@ class TemplateGenerator:
         if not self.openrouter_client:
             raise ValueError("OpenRouter client not set")
 
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         # Check cache first
         cache_key = self._get_cache_key(user_input)
@@ -108,19 +160,19 @@ class TemplateGenerator:
             # Cache the result
             self._cache_result(cache_key, result)
 
-            generation_time = time.time() - start_time
+            generation_time = time.perf_counter() - start_time
             result["metadata"]["generation_time_seconds"] = generation_time
             result["metadata"]["cached"] = False
 
             return result
 
         except TimeoutError:
-            generation_time = time.time() - start_time
+            generation_time = time.perf_counter() - start_time
             raise TimeoutError(
                 f"Template generation timed out after {generation_time:.1f} seconds (limit: {self.generation_timeout}s)"
             )
         except Exception as e:
-            generation_time = time.time() - start_time
+            generation_time = time.perf_counter() - start_time
             raise RuntimeError(
                 f"Template generation failed after {generation_time:.1f} seconds: {str(e)}"
             )
@@ -200,7 +252,7 @@ class TemplateGenerator:
             "pages": [],
             "databases": [],
             "metadata": {
-                "generated_at": datetime.utcnow().isoformat(),
+                "generated_at": datetime.now(timezone.utc).isoformat(),
                 "template_type": user_input.get("template_type", "general"),
                 "ai_model": getattr(self.openrouter_client, "default_model", "unknown"),
             },
@@ -309,34 +361,13 @@ class TemplateGenerator:
             Validated content blocks
         """
         valid_blocks = []
-        valid_types = {
-            "paragraph",
-            "heading_1",
-            "heading_2",
-            "heading_3",
-            "bulleted_list_item",
-            "numbered_list_item",
-            "to_do",
-            "code",
-            "quote",
-            "callout",
-            "divider",
-        }
 
         for block in blocks:
-            if isinstance(block, dict) and block.get("type") in valid_types:
+            if isinstance(block, dict) and block.get("type") in _VALID_BLOCK_TYPES:
                 # Ensure proper structure
                 if "content" in block:
                     block_type = block["type"]
-                    if block_type in [
-                        "paragraph",
-                        "heading_1",
-                        "heading_2",
-                        "heading_3",
-                        "bulleted_list_item",
-                        "numbered_list_item",
-                        "to_do",
-                    ]:
+                    if block_type in _RICH_TEXT_BLOCK_TYPES:
                         # Ensure rich_text structure
                         content = block["content"]
                         if isinstance(content, dict) and "rich_text" not in content:
@@ -361,33 +392,16 @@ class TemplateGenerator:
             Validated properties
         """
         valid_properties = {}
-        valid_types = {
-            "title",
-            "rich_text",
-            "number",
-            "select",
-            "multi_select",
-            "date",
-            "people",
-            "files",
-            "checkbox",
-            "url",
-            "email",
-            "phone_number",
-            "formula",
-            "relation",
-            "rollup",
-        }
 
         for prop_name, prop_config in properties.items():
             if isinstance(prop_config, dict):
                 prop_type = prop_config.get("type")
-                if prop_type in valid_types:
+                if prop_type in _VALID_PROPERTY_TYPES:
                     valid_properties[prop_name] = {prop_type: prop_config}
                 elif isinstance(prop_config, dict) and len(prop_config) == 1:
                     # Handle case where type is key
-                    prop_type = list(prop_config.keys())[0]
-                    if prop_type in valid_types:
+                    prop_type = next(iter(prop_config))
+                    if prop_type in _VALID_PROPERTY_TYPES:
                         valid_properties[prop_name] = prop_config
 
         return valid_properties
@@ -8,6 +8,10 @@ import re
 from datetime import datetime
 
 
+# Characters stripped from user-supplied strings by sanitize_string
+_UNSAFE_CHARS_RE = re.compile(r"[<>]")
+
+
 class TemplateValidator:
     """Service for validating templates and user input."""
 
@@ -64,6 +68,9 @@ class TemplateValidator:
         "last_edited_by",
     }
 
+    # Property types that carry select options
+    SELECT_PROPERTY_TYPES = {"select", "multi_select"}
+
     # Valid Notion block types
     VALID_BLOCK_TYPES = {
         "paragraph",
@@ -89,6 +96,17 @@ class TemplateValidator:
         "column",
     }
 
+    # Block types whose content carries a rich_text array
+    RICH_TEXT_BLOCK_TYPES = {
+        "paragraph",
+        "heading_1",
+        "heading_2",
+        "heading_3",
+        "bulleted_list_item",
+        "numbered_list_item",
+        "to_do",
+    }
+
     def validate_user_input(self, user_input: Dict[str, Any]) -> List[str]:
         """
         Validate user input for template generation.
@@ -375,20 +393,22 @@ class TemplateValidator:
             # Check property type
             if "title" in prop_config:
                 has_title = True
-            elif len(prop_config) == 1:
-                prop_type = list(prop_config.keys())[0]
-                if prop_type not in self.VALID_PROPERTY_TYPES:
-                    errors.append(
-                        f"{prefix}: invalid property type '{prop_type}' for '{prop_name}'"
-                    )
+                continue
+            if len(prop_config) != 1:
+                continue
 
+            prop_type = next(iter(prop_config))
+            if prop_type not in self.VALID_PROPERTY_TYPES:
+                errors.append(
+                    f"{prefix}: invalid property type '{prop_type}' for '{prop_name}'"
+                )
+            elif prop_type in self.SELECT_PROPERTY_TYPES:
                 # Validate select options
-                if prop_type in ["select", "multi_select"]:
-                    options = prop_config[prop_type].get("options", [])
-                    if len(options) > self.MAX_SELECT_OPTIONS:
-                        errors.append(
-                            f"{prefix}: too many options for '{prop_name}' (max {self.MAX_SELECT_OPTIONS})"
-                        )
+                options = prop_config[prop_type].get("options", [])
+                if len(options) > self.MAX_SELECT_OPTIONS:
+                    errors.append(
+                        f"{prefix}: too many options for '{prop_name}' (max {self.MAX_SELECT_OPTIONS})"
+                    )
 
         if not has_title:
             errors.append(f"{prefix}: must have at least one title property")
@@ -426,19 +446,9 @@ class TemplateValidator:
                 errors.append(f"{prefix}: content must be a dictionary")
 
             # Validate rich text for text blocks
-            if block_type in [
-                "paragraph",
-                "heading_1",
-                "heading_2",
-                "heading_3",
-                "bulleted_list_item",
-                "numbered_list_item",
-                "to_do",
-            ]:
-                if "rich_text" in content:
-                    rich_text = content["rich_text"]
-                    if not isinstance(rich_text, list):
-                        errors.append(f"{prefix}: rich_text must be a list")
+            if block_type in self.RICH_TEXT_BLOCK_TYPES and "rich_text" in content:
+                if not isinstance(content["rich_text"], list):
+                    errors.append(f"{prefix}: rich_text must be a list")
 
         return errors
 
@@ -458,7 +468,7 @@ class TemplateValidator:
         generated_at = metadata.get("generated_at")
         if generated_at:
             try:
-                datetime.fromisoformat(generated_at.replace("Z", "+00:00"))
+                datetime.fromisoformat(generated_at)
             except ValueError:
                 errors.append("Invalid generated_at timestamp format")
 
@@ -484,7 +494,7 @@ class TemplateValidator:
             text = str(text)
 
         # Remove potentially harmful characters
-        text = re.sub(r"[<>]", "", text)
+        text = _UNSAFE_CHARS_RE.sub("", text)
 
         # Trim whitespace
         text = text.strip()